@@ -23,9 +23,12 @@ class RTMDet(BaseTool):
                          backend=backend,
                          device=device)
         
+        # mean/std are in BGR order, so cv2 frames are normalized as-is
+        # (no BGR->RGB conversion anywhere on the detection path)
         if self.mean is not None:
             self.mean = np.array(mean, dtype=np.float32)
             self.std = np.array(std, dtype=np.float32)
+            self._std_nchw = self.std.reshape(1, -1, 1, 1)
 
     def __call__(self, image: np.ndarray):
         import time
@@ -60,6 +63,57 @@ class RTMDet(BaseTool):
         # Return results along with timing information
         return results, timing_info
 
+    def detect_batch(self, images: List[np.ndarray]):
+        """Detect on several images with a single batched model call.
+
+        Args:
+            images (List[np.ndarray]): Input images in shape (H, W, C).
+
+        Returns:
+            tuple:
+            - results (list): (final_boxes, final_scores) for each image.
+            - timing_info (dict): Timing of the batched call in ms.
+        """
+        import time
+        total_start = time.perf_counter()
+
+        preprocess_start = time.perf_counter()
+        preprocessed = [self.preprocess(img) for img in images]
+        preprocess_time = (time.perf_counter() - preprocess_start) * 1000
+
+        inference_start = time.perf_counter()
+        prep_time = model_time = 0
+        if (self.backend == 'onnxruntime'
+                and self.session.get_inputs()[0].shape[0] == 1):
+            # Model exported with a fixed batch size of 1: one call per image
+            outputs = []
+            for blob, _ in preprocessed:
+                outputs.append(self.inference(blob)[0])
+                prep_time += self._last_inference_timing['prep']
+                model_time += self._last_inference_timing['model']
+        else:
+            batch = np.concatenate([blob for blob, _ in preprocessed])
+            batch_outputs = self.inference(batch)[0]
+            outputs = [batch_outputs[i:i + 1] for i in range(len(images))]
+            prep_time = self._last_inference_timing['prep']
+            model_time = self._last_inference_timing['model']
+        inference_time = (time.perf_counter() - inference_start) * 1000
+
+        postprocess_start = time.perf_counter()
+        results = [self.postprocess(out, ratio)
+                   for out, (_, ratio) in zip(outputs, preprocessed)]
+        postprocess_time = (time.perf_counter() - postprocess_start) * 1000
+
+        timing_info = {
+            'total': (time.perf_counter() - total_start) * 1000,
+            'preprocess': preprocess_time,
+            'inference': inference_time,
+            'prep': prep_time,
+            'model': model_time,
+            'postprocess': postprocess_time
+        }
+        return results, timing_info
+
     def preprocess(self, img: np.ndarray):
         """Do preprocessing for RTMPose model inference.
 
@@ -68,36 +122,38 @@ class RTMDet(BaseTool):
 
         Returns:
             tuple:
-            - resized_img (np.ndarray): Preprocessed image.
-            - center (np.ndarray): Center of image.
-            - scale (np.ndarray): Scale of image.
+            - blob (np.ndarray): Preprocessed image as a (1, C, H, W)
+              float32 blob.
+            - ratio (float): Resize ratio of the image.
         """
         if len(img.shape) == 3:
-            padded_img = np.ones(
+            padded_img = np.full(
                 (self.model_input_size[0], self.model_input_size[1], 3),
-                dtype=np.uint8) * 114
+                114, dtype=np.uint8)
         else:
-            padded_img = np.ones(self.model_input_size, dtype=np.uint8) * 114
+            padded_img = np.full(self.model_input_size, 114, dtype=np.uint8)
 
         ratio = min(self.model_input_size[0] / img.shape[0],
                     self.model_input_size[1] / img.shape[1])
-        resized_img = cv2.resize(
+        padded_shape = (int(img.shape[0] * ratio), int(img.shape[1] * ratio))
+        # resize straight into the top-left of the padded image
+        cv2.resize(
             img,
-            (int(img.shape[1] * ratio), int(img.shape[0] * ratio)),
+            (padded_shape[1], padded_shape[0]),
+            dst=padded_img[:padded_shape[0], :padded_shape[1]],
             interpolation=cv2.INTER_LINEAR,
-        ).astype(np.uint8)
-        padded_shape = (int(img.shape[0] * ratio), int(img.shape[1] * ratio))
-        padded_img[:padded_shape[0], :padded_shape[1]] = resized_img
-
-        # normalize image
-        if self.mean is not None:        
-        # use CV2 for normalisation = 2x faster
-            padded_img = padded_img.astype(np.float32, copy=False)
-            cv2.subtract(padded_img, self.mean, dst=padded_img)
-            cv2.divide(padded_img, self.std, dst=padded_img)
+        )
 
+        # mean subtraction and HWC -> NCHW float32 in one OpenCV pass,
+        # then per-channel std on the blob
+        if self.mean is not None:
+            blob = cv2.dnn.blobFromImage(padded_img, 1.0,
+                                         mean=tuple(self.mean.tolist()))
+            blob /= self._std_nchw
+        else:
+            blob = cv2.dnn.blobFromImage(padded_img)
 
-        return padded_img, ratio
+        return blob, ratio
 
     def postprocess(
         self,
@@ -159,6 +215,7 @@ class RTMDet(BaseTool):
                 iscat = final_cls_inds == 0
                 isbbox = [i and j for (i, j) in zip(isscore, iscat)]
                 final_boxes = final_boxes[isbbox]
+                final_scores = final_scores[isbbox]
 
         elif outputs.shape[-1] == 5:
             # onnx contains nms module
@@ -169,5 +226,6 @@ class RTMDet(BaseTool):
             isscore = final_scores > 0.3
             isbbox = [i for i in isscore]
             final_boxes = final_boxes[isbbox]
+            final_scores = final_scores[isbbox]
 
         return final_boxes, final_scores
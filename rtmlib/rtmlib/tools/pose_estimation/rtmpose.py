@@ -5,7 +5,7 @@ import numpy as np
 
 from ..base import BaseTool
 from .post_processings import convert_coco_to_openpose, get_simcc_maximum
-from .pre_processings import bbox_xyxy2cs, top_down_affine
+from .pre_processings import bbox_xyxy2cs, get_warp_matrix
 
 
 class RTMPose(BaseTool):
@@ -26,13 +26,18 @@ class RTMPose(BaseTool):
         self.std = np.array(std, dtype=np.float32)
         # Store model input size as numpy array for vectorized postprocessing
         self.model_input_size_np = np.array(self.model_input_size)
+        # Per-channel mean/std broadcastable over CHW crops
+        self._mean_chw = self.mean.reshape(3, 1, 1)
+        self._std_chw = self.std.reshape(3, 1, 1)
+        # Persistent NCHW input batch, grown on demand in preprocess
+        self._batch_buf = None
 
     def __call__(self, image: np.ndarray, bboxes: list = []):
         import time
         total_start = time.perf_counter()
 
         # Handle case with no bounding boxes
-        if not bboxes:
+        if len(bboxes) == 0:
             num_keypoints = 17 # Default to COCO 17 keypoints if model info isn't readily available
             # Attempt to get num_keypoints from model output shape if possible (might need adjustment)
             try:
@@ -50,15 +55,12 @@ class RTMPose(BaseTool):
 
         # --- Batch Preprocessing ---
         preprocess_start = time.perf_counter()
-        batch_img_np, centers, scales = self.preprocess(image, bboxes)
+        batch_input, centers, scales = self.preprocess(image, bboxes)
         preprocess_time = (time.perf_counter() - preprocess_start) * 1000
 
         # --- Batch Inference ---
         inference_start = time.perf_counter()
-        # Transpose the batch from NHWC (output of preprocess) to NCHW for ONNX Runtime
-        batch_input = batch_img_np.transpose(0, 3, 1, 2)
-        # Ensure contiguous array for ONNX Runtime
-        batch_input = np.ascontiguousarray(batch_input, dtype=np.float32)
+        # preprocess already produced a contiguous float32 NCHW batch
         # Call inference ONCE with the batch
         outputs = self.inference(batch_input) # BaseTool.inference handles the dict creation
         inference_time = (time.perf_counter() - inference_start) * 1000
@@ -69,7 +71,7 @@ class RTMPose(BaseTool):
 
         # --- Batch Postprocessing ---
         postprocess_start = time.perf_counter()
-        keypoints, scores = self.postprocess(outputs, centers, scales) # Pass lists of centers/scales
+        keypoints, scores = self.postprocess(outputs, centers, scales)
         postprocess_time = (time.perf_counter() - postprocess_start) * 1000
 
         # --- Final Steps ---
@@ -91,59 +93,127 @@ class RTMPose(BaseTool):
 
         return keypoints, scores, timing_info
 
-    def preprocess(self, img: np.ndarray, bboxes: list):
+    def pose_batch(self, images: List[np.ndarray], bboxes_list: List[list]):
+        """Estimate poses for bboxes from several images with a single batched model call.
+
+        Args:
+            images (List[np.ndarray]): Input images in shape (H, W, C).
+            bboxes_list (List[list]): xyxy-format bounding boxes for each image.
+
+        Returns:
+            tuple:
+            - results (list): (keypoints, scores) for each image.
+            - timing_info (dict): Timing of the batched call in ms.
+        """
+        import time
+        total_start = time.perf_counter()
+        counts = [len(bboxes) for bboxes in bboxes_list]
+        num_bboxes = sum(counts)
+
+        if num_bboxes == 0:
+            results = [(np.empty((0, 17, 2)), np.empty((0, 17))) for _ in images]
+            timing_info = {
+                'total': (time.perf_counter() - total_start) * 1000,
+                'preprocess': 0, 'prep': 0, 'model': 0, 'postprocess': 0, 'num_bboxes': 0
+            }
+            return results, timing_info
+
+        # Crops of all images go into consecutive slots of one NCHW batch
+        preprocess_start = time.perf_counter()
+        batch_input = self._get_batch_buf(num_bboxes)
+        centers, scales = [], []
+        start = 0
+        for img, bboxes, count in zip(images, bboxes_list, counts):
+            if count == 0:
+                continue
+            _, img_centers, img_scales = self.preprocess(
+                img, bboxes, out=batch_input[start:start + count])
+            centers.append(img_centers)
+            scales.append(img_scales)
+            start += count
+        preprocess_time = (time.perf_counter() - preprocess_start) * 1000
+
+        outputs = self.inference(batch_input)
+
+        postprocess_start = time.perf_counter()
+        keypoints, scores = self.postprocess(outputs, np.concatenate(centers),
+                                             np.concatenate(scales))
+        if self.to_openpose:
+            keypoints, scores = convert_coco_to_openpose(keypoints, scores)
+        splits = np.cumsum(counts)[:-1]
+        results = list(zip(np.split(keypoints, splits), np.split(scores, splits)))
+        postprocess_time = (time.perf_counter() - postprocess_start) * 1000
+
+        timing_info = {
+            'total': (time.perf_counter() - total_start) * 1000,
+            'preprocess': preprocess_time,
+            'prep': self._last_inference_timing.get('prep', 0),
+            'model': self._last_inference_timing.get('model', 0),
+            'postprocess': postprocess_time,
+            'num_bboxes': num_bboxes
+        }
+        return results, timing_info
+
+    def _get_batch_buf(self, num_bboxes: int):
+        """Return the first num_bboxes slots of the persistent NCHW input buffer,
+        growing it (at least doubling) when it is too small."""
+        w, h = self.model_input_size
+        if self._batch_buf is None or self._batch_buf.shape[0] < num_bboxes:
+            capacity = max(num_bboxes, 2 * (0 if self._batch_buf is None else self._batch_buf.shape[0]))
+            self._batch_buf = np.empty((capacity, 3, h, w), dtype=np.float32)
+        return self._batch_buf[:num_bboxes]
+
+    def preprocess(self, img: np.ndarray, bboxes: list, out: np.ndarray = None):
         """Do preprocessing for RTMPose model inference for a batch of bounding boxes.
 
+        Crops are normalized straight into a persistent NCHW float32 buffer,
+        which is only reallocated when more bboxes than its capacity arrive.
+
         Args:
             img (np.ndarray): Input image in shape (H, W, C).
             bboxes (list): A list of xyxy-format bounding boxes.
+            out (np.ndarray, optional): (N, C, H, W) float32 array to write
+              the crops into instead of the persistent buffer.
 
         Returns:
             tuple:
-            - batch_img_np (np.ndarray): Batch of preprocessed images (N, H, W, C).
-            - centers (list): List of centers corresponding to each bbox.
-            - scales (list): List of scales corresponding to each bbox.
+            - batch_input (np.ndarray): Batch of preprocessed images (N, C, H, W),
+              a view into the persistent buffer (or out).
+            - centers (np.ndarray): Centers corresponding to each bbox (N, 2).
+            - scales (np.ndarray): Scales corresponding to each bbox (N, 2).
         """
-        batch_img = []
-        centers = []
-        scales = []
+        num_bboxes = len(bboxes)
+        w, h = self.model_input_size
+        batch_input = self._get_batch_buf(num_bboxes) if out is None else out
 
-        for bbox in bboxes:
-            bbox_np = np.array(bbox)
-            # get center and scale
-            center, scale = bbox_xyxy2cs(bbox_np, padding=1.25)
+        # get center and scale for all bboxes at once
+        bboxes_np = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+        centers, scales = bbox_xyxy2cs(bboxes_np, padding=1.25)
 
+        # reshape bboxes to the model aspect ratio (as top_down_affine does)
+        aspect_ratio = w / h
+        b_w, b_h = scales[:, 0:1], scales[:, 1:2]
+        scales = np.where(b_w > b_h * aspect_ratio,
+                          np.hstack([b_w, b_w / aspect_ratio]),
+                          np.hstack([b_h * aspect_ratio, b_h]))
+
+        for i in range(num_bboxes):
             # do affine transformation
-            # top_down_affine returns the transformed image crop
-            resized_img, updated_scale = top_down_affine(self.model_input_size, scale, center, img)
-
-            # normalize image
-            if self.mean is not None:
-                # Use float32 for normalization
-                resized_img_float = resized_img.astype(np.float32, copy=True) # Use copy=True to avoid modifying previous loop items if needed
-                cv2.subtract(resized_img_float, self.mean, dst=resized_img_float)
-                cv2.divide(resized_img_float, self.std, dst=resized_img_float)
-                batch_img.append(resized_img_float)
-            else:
-                 batch_img.append(resized_img) # Append original uint8 if no normalization
-
-            centers.append(center)
-            scales.append(updated_scale) # Store the scale used for the transformation
-
-        # Stack the processed images into a batch
-        if batch_img:
-            batch_img_np = np.stack(batch_img, axis=0)
-        else:
-            # Handle case with no bounding boxes
-            batch_img_np = np.empty((0, self.model_input_size[0], self.model_input_size[1], 3), dtype=np.float32)
-
-        return batch_img_np, centers, scales
+            warp_mat = get_warp_matrix(centers[i], scales[i], 0, output_size=(w, h))
+            resized_img = cv2.warpAffine(img, warp_mat, (int(w), int(h)), flags=cv2.INTER_LINEAR)
+
+            # normalize HWC crop directly into the NCHW batch slot
+            crop_chw = resized_img.transpose(2, 0, 1)
+            np.subtract(crop_chw, self._mean_chw, out=batch_input[i])
+            np.divide(batch_input[i], self._std_chw, out=batch_input[i])
+
+        return batch_input, centers, scales
 
     def postprocess(
             self,
             outputs: List[np.ndarray], # Expects BATCHED outputs [batch_simcc_x, batch_simcc_y]
-            centers: list,             # List of centers
-            scales: list,              # List of scales
+            centers: np.ndarray,       # Centers (N, 2)
+            scales: np.ndarray,        # Scales (N, 2)
             simcc_split_ratio: float = 2.0) -> Tuple[np.ndarray, np.ndarray]:
         """Postprocess for RTMPose model output for a batch.
 
@@ -151,8 +221,8 @@ class RTMPose(BaseTool):
             outputs (List[np.ndarray]): Batched output of RTMPose model.
                                         [0]: simcc_x (N, K, Ws)
                                         [1]: simcc_y (N, K, Hs)
-            centers (list): List of centers corresponding to the batch.
-            scales (list): List of scales corresponding to the batch.
+            centers (np.ndarray): Centers corresponding to the batch (N, 2).
+            scales (np.ndarray): Scales corresponding to the batch (N, 2).
             simcc_split_ratio (float): Split ratio of simcc.
 
         Returns:
@@ -167,39 +237,14 @@ class RTMPose(BaseTool):
         if num_bboxes == 0:
             return np.empty((0, num_keypoints, 2)), np.empty((0, num_keypoints))
 
-        # Process the batch using loops (assuming get_simcc_maximum is not batched)
-        batch_keypoints_list = []
-        batch_scores_list = []
-
-        # Pre-convert lists to numpy arrays for efficiency inside loop if needed
-        centers_np = np.array(centers) # Shape (N, 2)
-        scales_np = np.array(scales)   # Shape (N, 2)
-
-        for i in range(num_bboxes):
-            # Process each item in the batch
-            simcc_x = batch_simcc_x[i:i+1] # Keep batch dim for get_simcc_maximum (N=1, K, Ws)
-            simcc_y = batch_simcc_y[i:i+1] # Keep batch dim for get_simcc_maximum (N=1, K, Hs)
-            center = centers_np[i] # Shape (2,)
-            scale = scales_np[i]   # Shape (2,)
-
-            # Decode simcc for one item
-            # get_simcc_maximum expects batch input (N, K, Ws/Hs)
-            locs, scores = get_simcc_maximum(simcc_x, simcc_y)
-            # locs shape: (1, K, 2), scores shape: (1, K)
-            locs = locs[0] # Remove batch dim -> (K, 2)
-            scores = scores[0] # Remove batch dim -> (K,)
-
-            keypoints = locs / simcc_split_ratio
-
-            # Rescale keypoints for one item
-            keypoints = keypoints / self.model_input_size_np * scale
-            keypoints = keypoints + center - scale / 2
-
-            batch_keypoints_list.append(keypoints)
-            batch_scores_list.append(scores)
+        # Decode simcc for the whole batch at once
+        locs, scores = get_simcc_maximum(batch_simcc_x, batch_simcc_y)
+        keypoints = locs / simcc_split_ratio
 
-        # Stack results at the end
-        final_keypoints = np.stack(batch_keypoints_list, axis=0) # Shape (N, K, 2)
-        final_scores = np.stack(batch_scores_list, axis=0)       # Shape (N, K)
+        # Rescale keypoints, broadcasting each bbox's center/scale over its K keypoints
+        centers = np.asarray(centers)[:, None, :]
+        scales = np.asarray(scales)[:, None, :]
+        keypoints = keypoints / self.model_input_size_np * scales
+        keypoints = keypoints + centers - scales / 2
 
-        return final_keypoints, final_scores
+        return keypoints, scores
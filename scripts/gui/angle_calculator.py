@@ -1,8 +1,12 @@
 """
 Joint angle calculation utilities
 """
+import math
+
 import numpy as np
 
+from numba_compat import njit  # numba is optional; kernels then run as plain Python
+
 # COCO17 keypoint indices
 LEFT_SHOULDER_IDX = 5
 RIGHT_SHOULDER_IDX = 6
@@ -17,6 +21,12 @@ RIGHT_KNEE_IDX = 14
 LEFT_ANKLE_IDX = 15
 RIGHT_ANKLE_IDX = 16
 
+# (proximal, vertex, distal) index triplets for batched angle calculation
+LEFT_HIP_KNEE_TRIPLETS = np.array([
+    [LEFT_SHOULDER_IDX, LEFT_HIP_IDX, LEFT_KNEE_IDX],   # hip: shoulder - hip - knee
+    [LEFT_HIP_IDX, LEFT_KNEE_IDX, LEFT_ANKLE_IDX],      # knee: hip - knee - ankle
+], dtype=np.intp)
+
 
 def calculate_angle(point1, point2, point3, signed=False):
     """
@@ -68,6 +78,58 @@ def calculate_angle(point1, point2, point3, signed=False):
     return round(angle_deg)
 
 
+@njit(cache=True)
+def _joint_angle(ax, ay, bx, by, cx, cy):
+    """Signed supplementary angle (degrees) at b for a-b-c, NaN if degenerate"""
+    v1x, v1y = ax - bx, ay - by
+    v2x, v2y = cx - bx, cy - by
+    dot = v1x * v2x + v1y * v2y
+    cross = v1x * v2y - v1y * v2x
+    if dot == 0.0 and cross == 0.0:
+        return math.nan
+    angle = 180.0 - math.degrees(math.atan2(abs(cross), dot))
+    return -angle if cross < 0.0 else angle
+
+
+@njit(cache=True)
+def _joint_angles(keypoints, scores, triplets, confidence_threshold):
+    """Raw signed angles for each (a, b, c) triplet, NaN if not confident"""
+    angles = np.empty(triplets.shape[0])
+    for j in range(triplets.shape[0]):
+        a, b, c = triplets[j, 0], triplets[j, 1], triplets[j, 2]
+        if (scores[a] < confidence_threshold or scores[b] < confidence_threshold
+                or scores[c] < confidence_threshold):
+            angles[j] = math.nan
+        else:
+            angles[j] = _joint_angle(keypoints[a, 0], keypoints[a, 1],
+                                     keypoints[b, 0], keypoints[b, 1],
+                                     keypoints[c, 0], keypoints[c, 1])
+    return angles
+
+
+def calculate_angles_batch(keypoints, scores, triplets, confidence_threshold=0.5):
+    """
+    Calculate signed angles for several joints at once.
+    
+    Same convention as calculate_angle(..., signed=True), but all joints are
+    computed in one compiled kernel call (Numba, if installed).
+    
+    Args:
+        keypoints: Array of keypoint coordinates [17, 2]
+        scores: Array of keypoint confidence scores [17]
+        triplets: Index array [J, 3] of (point1, vertex, point3) keypoints
+        confidence_threshold: Minimum confidence for valid calculation
+        
+    Returns:
+        angles: Float array [J] of rounded angles in degrees
+                (NaN where keypoints are not confident or degenerate)
+    """
+    angles = _joint_angles(np.ascontiguousarray(keypoints, dtype=np.float64),
+                           np.ascontiguousarray(scores, dtype=np.float64),
+                           triplets, float(confidence_threshold))
+    return np.round(angles)
+
+
 def calculate_hip_angle(keypoints, scores, side='left', confidence_threshold=0.5):
     """
     Calculate hip angle: shoulder - hip - knee
@@ -103,7 +165,9 @@ def calculate_hip_angle(keypoints, scores, side='left', confidence_threshold=0.5
     knee = keypoints[knee_idx]
     
     try:
-        angle = calculate_angle(shoulder, hip, knee, signed=True)
+        angle = round(_joint_angle(float(shoulder[0]), float(shoulder[1]),
+                                   float(hip[0]), float(hip[1]),
+                                   float(knee[0]), float(knee[1])))
         # Reverse sign for hip angle (positive=extension, negative=flexion)
         return -angle
     except Exception as e:
@@ -146,7 +210,9 @@ def calculate_knee_angle(keypoints, scores, side='left', confidence_threshold=0.
     ankle = keypoints[ankle_idx]
     
     try:
-        angle = calculate_angle(hip, knee, ankle, signed=True)
+        angle = round(_joint_angle(float(hip[0]), float(hip[1]),
+                                   float(knee[0]), float(knee[1]),
+                                   float(ankle[0]), float(ankle[1])))
         return angle
     except Exception as e:
         print(f"Error calculating knee angle: {e}")
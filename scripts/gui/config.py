@@ -1,6 +1,8 @@
 """
 Configuration management for Lab MoCap GUI
 """
+import numpy as np
+
 
 class AppConfig:
     """Application configuration state"""
@@ -57,6 +59,10 @@ class AppConfig:
         # Angle tracking
         self.selected_track_id = None  # Which person to track for angles
         
+        # Cached drawing data derived from the display options (see notify_changed)
+        self.connection_groups = {}
+        self.notify_changed()
+        
     def get_active_connections(self):
         """Get list of all active skeleton connections with their colors and thickness"""
         connections = []
@@ -70,6 +76,20 @@ class AppConfig:
                     })
         return connections
     
+    def notify_changed(self):
+        """Rebuild cached drawing data after display options change
+        
+        connection_groups maps (bgr_color, thickness) to an (M, 2) index array of
+        the active connections drawn with that style, so drawing code can issue one
+        call per group without walking the config dicts every frame.
+        """
+        groups = {}
+        for conn in self.get_active_connections():
+            key = (tuple(conn['color']), conn['thickness'])
+            groups.setdefault(key, []).append(conn['indices'])
+        self.connection_groups = {key: np.array(pairs, dtype=np.intp)
+                                  for key, pairs in groups.items()}
+    
     def reset_display_defaults(self):
         """Reset display options to default RTMPose values"""
         self.show_bboxes = True
@@ -87,3 +107,4 @@ class AppConfig:
             'torso': {'enabled': True, 'color': (255, 0, 255), 'thickness': 2},
             'head': {'enabled': True, 'color': (255, 153, 51), 'thickness': 2}
         }
+        self.notify_changed()
@@ -195,6 +195,7 @@ class DisplayDialog(QDialog):
             self.config.skeleton_groups[group_key]['color'] = (
                 color.blue(), color.green(), color.red()
             )
+            self.config.notify_changed()
             
     def reset_defaults(self):
         """Reset all display options to defaults"""
@@ -235,6 +236,7 @@ class DisplayDialog(QDialog):
             self.config.skeleton_groups[group_key]['thickness'] = widgets['thickness_slider'].value()
             # Color is already updated in choose_color method
         
+        self.config.notify_changed()
         self.accept()
         
     def reject(self):
@@ -245,4 +247,5 @@ class DisplayDialog(QDialog):
         self.config.keypoint_size = self.original_keypoint_size
         self.config.show_skeleton = self.original_show_skeleton
         self.config.skeleton_groups = self.original_skeleton_groups
+        self.config.notify_changed()
         super().reject()
@@ -2,6 +2,7 @@
 Gait analysis utilities for treadmill running
 Includes footstrike detection and stride segmentation
 """
+import cv2
 import numpy as np
 from scipy.signal import butter, filtfilt, find_peaks
 from scipy.interpolate import interp1d
@@ -9,6 +10,47 @@ import matplotlib.pyplot as plt
 import os
 
 
+class RecordedVideoFrames:
+    """
+    Lazy, indexable view over the frames of a recorded video file.
+    
+    Frames are decoded on access (as RGB), so stride segmentation can slice
+    and pick inset frames without the whole recording being held in memory.
+    """
+    
+    def __init__(self, video_path, start=0, stop=None):
+        self.video_path = video_path
+        self.start = start
+        if stop is None:
+            cap = cv2.VideoCapture(video_path)
+            stop = start + int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            cap.release()
+        self.stop = stop
+        
+    def __len__(self):
+        return max(0, self.stop - self.start)
+    
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                raise ValueError("Only contiguous slices are supported")
+            return RecordedVideoFrames(self.video_path, self.start + start, self.start + stop)
+        
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("Frame index out of range")
+        
+        cap = cv2.VideoCapture(self.video_path)
+        cap.set(cv2.CAP_PROP_POS_FRAMES, self.start + key)
+        ok, frame = cap.read()
+        cap.release()
+        if not ok:
+            raise IndexError(f"Could not read frame {self.start + key} from {self.video_path}")
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+
 def butterworth_filter(data, cutoff=10, fs=30, order=1):
     """
     Apply Butterworth low-pass filter to data
@@ -82,7 +124,7 @@ def segment_strides(data, footstrike_indices, frames=None):
     Args:
         data: Dictionary with keys 'hip_angles', 'knee_angles', 'ankle_x', 'ankle_y'
         footstrike_indices: Array of footstrike frame indices
-        frames: Optional list of video frames
+        frames: Optional sequence of video frames (list or RecordedVideoFrames)
         
     Returns:
         strides: List of dictionaries, each containing one stride's data
@@ -283,7 +325,6 @@ def _plot_normalized_with_frames(stride_percent, normalized_data, frame_insets,
         output_dir: Directory to save plot
         filename: Output filename
     """
-    import cv2
     from matplotlib.gridspec import GridSpec
     
     # Create figure with extra space at top for frames
@@ -358,13 +399,13 @@ def analyze_recording(hip_angles, knee_angles, ankle_coords, output_dir, recordi
     Complete analysis pipeline for a recording
     
     Args:
-        hip_angles: List of hip angles
-        knee_angles: List of knee angles
-        ankle_coords: List of (x, y) tuples for ankle positions
+        hip_angles: Array (or list) of hip angles
+        knee_angles: Array (or list) of knee angles
+        ankle_coords: Array [N, 2] (or list of (x, y) tuples) of ankle positions
         output_dir: Directory to save outputs
         recording_name: Name of recording
         fps: Frame rate (default 30)
-        frames: Optional list of video frames for visualization
+        frames: Optional sequence of video frames for visualization
         
     Returns:
         analysis_results: Dictionary with analysis results
@@ -372,8 +413,9 @@ def analyze_recording(hip_angles, knee_angles, ankle_coords, output_dir, recordi
     # Convert to numpy arrays
     hip_angles = np.array(hip_angles)
     knee_angles = np.array(knee_angles)
-    ankle_x = np.array([coord[0] for coord in ankle_coords])
-    ankle_y = np.array([coord[1] for coord in ankle_coords])
+    ankle_coords = np.asarray(ankle_coords, dtype=np.float64).reshape(-1, 2)
+    ankle_x = ankle_coords[:, 0]
+    ankle_y = ankle_coords[:, 1]
     
     # Filter ankle trajectory
     ankle_x_filtered = butterworth_filter(ankle_x, cutoff=10, fs=fps, order=1)
@@ -7,7 +7,6 @@ from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
 from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QImage, QPixmap
 import cv2
-import numpy as np
 
 from .config import AppConfig
 from .input_dialog import InputDialog
@@ -24,7 +23,8 @@ class MainWindow(QMainWindow):
         super().__init__()
         self.config = AppConfig()
         self.video_thread = None
-        self.current_track_ids = set()
+        self.current_track_ids = frozenset()
+        self.track_ids_dirty = False
         
         self.setWindowTitle("Lab MoCap - Human Pose Estimation")
         self.setGeometry(100, 100, 1600, 900)
@@ -139,6 +139,12 @@ class MainWindow(QMainWindow):
         
     def populate_track_ids(self):
         """Populate track ID dropdown with current IDs"""
+        # Only rebuild the list if the set of track IDs changed since last time
+        if not self.track_ids_dirty:
+            QComboBox.showPopup(self.track_id_combo)
+            return
+        self.track_ids_dirty = False
+        
         # Store current selection
         current_text = self.track_id_combo.currentText()
         
@@ -189,7 +195,8 @@ class MainWindow(QMainWindow):
             self.video_thread.wait()
         
         # Clear current track IDs
-        self.current_track_ids.clear()
+        self.current_track_ids = frozenset()
+        self.track_ids_dirty = True
         self.config.selected_track_id = None
         self.track_id_combo.setCurrentText("None")
         
@@ -200,17 +207,24 @@ class MainWindow(QMainWindow):
         
         self.start_video_processing()
         
-    def update_display(self, frame, track_data, keypoints_list, scores_list, angles):
-        """Update display with new frame data"""
+    def update_display(self, frame, tracks, keypoints_array, scores_array, angles):
+        """Update display with new frame data (tracks: (N, 6) [x1, y1, x2, y2, id, score])"""
         # Draw overlays on frame
-        display_frame = self.draw_overlays(frame.copy(), track_data, keypoints_list, scores_list)
+        display_frame = self.draw_overlays(frame, tracks, keypoints_array, scores_array)
+        
+        # Update track IDs (only when the set actually changed)
+        track_ids = tracks[:, 4].astype(int).tolist()
+        new_ids = frozenset(track_ids)
+        if new_ids != self.current_track_ids:
+            self.current_track_ids = new_ids
+            self.track_ids_dirty = True
         
-        # Update track IDs
-        self.current_track_ids = {track['id'] for track in track_data}
+        # Map track ID -> index once per frame for O(1) lookups
+        id_to_idx = {track_id: i for i, track_id in enumerate(track_ids)}
         
         # Update angle graphs if a track is selected
         if self.config.selected_track_id is not None:
-            self.update_angle_graphs(track_data, keypoints_list, scores_list)
+            self.update_angle_graphs(id_to_idx, keypoints_array, scores_array)
         
         # Convert frame to QPixmap and display
         height, width, channel = display_frame.shape
@@ -222,35 +236,29 @@ class MainWindow(QMainWindow):
         scaled_pixmap = pixmap.scaled(self.video_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
         self.video_label.setPixmap(scaled_pixmap)
         
-    def draw_overlays(self, frame, track_data, keypoints_list, scores_list):
+    def draw_overlays(self, frame, tracks, keypoints_array, scores_array):
         """Draw overlays on frame based on display configuration"""
-        # Convert BGR to RGB for display
+        # Convert BGR to RGB for display (cvtColor allocates the buffer we draw on,
+        # so the caller's frame is never modified)
         frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         
-        for i, track in enumerate(track_data):
-            track_id = track['id']
-            bbox = track['bbox']
-            score = track['score']
+        for i, (x1, y1, x2, y2, track_id, score) in enumerate(tracks.tolist()):
+            x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
             
             # Draw bounding box
             if self.config.show_bboxes:
-                x1, y1, x2, y2 = [int(v) for v in bbox]
                 cv2.rectangle(frame, (x1, y1), (x2, y2), (255, 0, 0), 2)
             
             # Draw track ID
             if self.config.show_track_ids:
-                x1, y1 = int(bbox[0]), int(bbox[1])
-                label = f"ID: {track_id}"
-                if score is not None:
-                    label += f" | {score:.2f}"
+                label = f"ID: {int(track_id)} | {score:.2f}"
                 cv2.putText(frame, label, (x1, y1 - 5),
                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 0, 0), 2)
             
             # Draw keypoints and skeleton
-            if i < len(keypoints_list):
-                # Convert lists back to numpy arrays for processing
-                keypoints = np.array(keypoints_list[i])
-                kpt_scores = np.array(scores_list[i])
+            if i < len(keypoints_array):
+                keypoints = keypoints_array[i]
+                kpt_scores = scores_array[i]
                 
                 # Draw skeleton connections
                 if self.config.show_skeleton:
@@ -275,21 +283,17 @@ class MainWindow(QMainWindow):
         
         return frame
         
-    def update_angle_graphs(self, track_data, keypoints_list, scores_list):
+    def update_angle_graphs(self, id_to_idx, keypoints_array, scores_array):
         """Update angle graphs for selected track"""
         # Find the selected track
-        track_idx = None
-        for i, track in enumerate(track_data):
-            if track['id'] == self.config.selected_track_id:
-                track_idx = i
-                break
+        track_idx = id_to_idx.get(self.config.selected_track_id)
         
-        if track_idx is None or track_idx >= len(keypoints_list):
+        if track_idx is None or track_idx >= len(keypoints_array):
             # Track not found or no keypoints, clear graphs
             return
         
-        keypoints = keypoints_list[track_idx]
-        scores = scores_list[track_idx]
+        keypoints = keypoints_array[track_idx]
+        scores = scores_array[track_idx]
         
         # Calculate angles for each graph
         # Parse joint selection (e.g., "Left Hip" -> side='left', joint='hip')
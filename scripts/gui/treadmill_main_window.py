@@ -3,20 +3,71 @@ Main window for Treadmill Analysis GUI
 """
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QLabel, QMessageBox, QSizePolicy)
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QEvent
 from PyQt5.QtGui import QImage, QPixmap
 import cv2
 import numpy as np
 import os
-import csv
+import queue
 from threading import Thread
 
+try:
+    import av  # optional: PyAV for NVENC hardware encoding of recordings
+except ImportError:
+    av = None
+
 from .config import AppConfig
 from .treadmill_video_thread import TreadmillVideoThread
 from .treadmill_angle_graph import TreadmillAngleGraph
 from .recording_widget import RecordingWidget
-from .angle_calculator import calculate_hip_angle, calculate_knee_angle, LEFT_ANKLE_IDX
-from .gait_analysis import analyze_recording
+from .angle_calculator import calculate_angles_batch, LEFT_HIP_KNEE_TRIPLETS, LEFT_ANKLE_IDX
+from .gait_analysis import analyze_recording, RecordedVideoFrames
+
+
+# Initial capacity of the recording buffers (10 min at 30 fps, doubled if exceeded)
+MAX_REC_FRAMES = 30 * 60 * 10
+
+
+class NvencVideoWriter:
+    """H.264 NVENC encoder via PyAV with the cv2.VideoWriter write/release interface"""
+    
+    def __init__(self, video_path, fps, size):
+        self.container = av.open(video_path, 'w')
+        try:
+            self.stream = self.container.add_stream('h264_nvenc', rate=fps)
+            self.stream.width, self.stream.height = size
+            self.stream.pix_fmt = 'yuv420p'
+            # Open the encoder now so a missing GPU/driver fails here, not mid-recording
+            self.stream.codec_context.open()
+        except Exception:
+            self.container.close()
+            raise
+        
+    def write(self, frame):
+        """Encode one BGR frame"""
+        self.container.mux(self.stream.encode(av.VideoFrame.from_ndarray(frame, format='bgr24')))
+        
+    def release(self):
+        """Flush the encoder and close the file"""
+        self.container.mux(self.stream.encode(None))
+        self.container.close()
+
+
+def open_video_writer(video_path, fps, size):
+    """Open a recording writer: NVENC via PyAV if available, else OpenCV mp4v"""
+    if av is not None:
+        try:
+            return NvencVideoWriter(video_path, fps, size)
+        except Exception as e:
+            print(f"NVENC encoder unavailable ({e}), falling back to mp4v")
+    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+    return cv2.VideoWriter(video_path, fourcc, fps, size)
+
+
+def csv_column(values, fmt, num_rows):
+    """Format values as CSV cells, padded to num_rows with empty cells"""
+    cells = [fmt(v) for v in values.tolist()]
+    return cells + [''] * (num_rows - len(cells))
 
 
 class TreadmillMainWindow(QMainWindow):
@@ -30,14 +81,24 @@ class TreadmillMainWindow(QMainWindow):
         # Recording state
         self.is_recording = False
         self.recording_name = ""
-        self.recording_data = {
-            'hip_angles': [],
-            'knee_angles': [],
-            'ankle_coords': [],
-            'frames': []
-        }
+        self.recording_data = {}
+        self.recording_counts = {}
+        self.reset_recording_data()
         self.frame_count = 0
         
+        # Live video writer (frames are encoded while recording, not buffered in RAM)
+        self.video_path = None
+        self._write_q = None
+        self._writer_thread = None
+        
+        # Persistent RGB buffer for the scaled display frame (reallocated only on size change)
+        self._rgb_buf = None
+        
+        # Run the display resize through OpenCL (T-API) when a device is available,
+        # keeping it off the CPU that drives the GUI event loop
+        self.use_ocl = cv2.ocl.haveOpenCL()
+        cv2.ocl.setUseOpenCL(self.use_ocl)
+        
         self.setWindowTitle("Lab MoCap - Treadmill Analysis")
         self.setGeometry(100, 100, 1600, 900)
         
@@ -65,8 +126,18 @@ class TreadmillMainWindow(QMainWindow):
         self.video_label.setStyleSheet("QLabel { background-color: black; }")
         main_layout.addWidget(self.video_label, stretch=1)
         
+        # Cache label size (updated on resize events) for per-frame scaling
+        self.display_size = (800, 600)
+        self.video_label.installEventFilter(self)
+        
         central_widget.setLayout(main_layout)
         
+    def eventFilter(self, obj, event):
+        """Track video label size changes"""
+        if obj is self.video_label and event.type() == QEvent.Resize:
+            self.display_size = (event.size().width(), event.size().height())
+        return super().eventFilter(obj, event)
+        
     def create_left_sidebar(self):
         """Create the left sidebar with angle graphs and recording controls"""
         sidebar = QWidget()
@@ -99,11 +170,8 @@ class TreadmillMainWindow(QMainWindow):
         self.video_thread.error_occurred.connect(self.show_error)
         self.video_thread.start()
         
-    def update_display(self, frame, track_data, keypoints_list, scores_list):
+    def update_display(self, frame, track_data, keypoints_array, scores_array, frame_id):
         """Update display with new frame data"""
-        # Draw overlays on frame
-        display_frame = self.draw_overlays(frame.copy(), track_data, keypoints_list, scores_list)
-        
         # Find lowest track ID (automatic selection)
         if len(track_data) > 0:
             # Sort by track ID and get the lowest
@@ -118,52 +186,88 @@ class TreadmillMainWindow(QMainWindow):
                     break
             
             # Update angle graphs if track found
-            if track_idx is not None and track_idx < len(keypoints_list):
-                keypoints = np.array(keypoints_list[track_idx])
-                scores = np.array(scores_list[track_idx])
+            if track_idx is not None and track_idx < len(keypoints_array):
+                keypoints = keypoints_array[track_idx]
+                scores = scores_array[track_idx]
                 
-                # Calculate hip angle
-                hip_angle = calculate_hip_angle(keypoints, scores, side='left')
-                if hip_angle is not None:
+                # Calculate hip and knee angles in one batched call
+                hip_raw, knee_raw = calculate_angles_batch(keypoints, scores, LEFT_HIP_KNEE_TRIPLETS)
+                
+                # Hip angle (sign reversed: positive=extension, negative=flexion)
+                if not np.isnan(hip_raw):
+                    hip_angle = -int(hip_raw)
                     self.hip_graph.add_data_point(hip_angle)
                     
                     # Record if recording is active
                     if self.is_recording:
-                        self.recording_data['hip_angles'].append(hip_angle)
+                        self.record_value('hip_angles', hip_angle)
                 
-                # Calculate knee angle
-                knee_angle = calculate_knee_angle(keypoints, scores, side='left')
-                if knee_angle is not None:
+                # Knee angle
+                if not np.isnan(knee_raw):
+                    knee_angle = int(knee_raw)
                     self.knee_graph.add_data_point(knee_angle)
                     
                     # Record if recording is active
                     if self.is_recording:
-                        self.recording_data['knee_angles'].append(knee_angle)
+                        self.record_value('knee_angles', knee_angle)
                 
                 # Get ankle coordinates for recording
                 if self.is_recording:
                     ankle_coord = keypoints[LEFT_ANKLE_IDX]
-                    self.recording_data['ankle_coords'].append((ankle_coord[0], ankle_coord[1]))
+                    self.record_value('ankle_coords', ankle_coord)
+        
+        # If newer frames are already queued (GUI behind the camera), skip the
+        # drawing/display work for this one; recording still needs every frame
+        stale = frame_id < self.video_thread.latest_frame_id - 1
+        if stale and not self.is_recording:
+            return
         
-        # Save frame if recording
+        # Draw overlays on frame
+        display_frame = self.draw_overlays(frame, track_data, keypoints_array, scores_array)
+        
+        # Queue BGR frame for the video writer if recording
+        # (each emitted frame is a fresh capture buffer, so no copy is needed)
         if self.is_recording:
-            self.recording_data['frames'].append(display_frame.copy())
+            self._write_q.put(display_frame)
             self.frame_count += 1
         
-        # Convert frame to QPixmap and display
-        height, width, channel = display_frame.shape
-        bytes_per_line = 3 * width
-        q_image = QImage(display_frame.data, width, height, bytes_per_line, QImage.Format_RGB888)
-        pixmap = QPixmap.fromImage(q_image)
+        if stale:
+            return
         
         # Scale to fit label while maintaining aspect ratio
-        scaled_pixmap = pixmap.scaled(self.video_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-        self.video_label.setPixmap(scaled_pixmap)
+        # (cv2.resize is SIMD/multi-threaded, much cheaper than QPixmap smooth scaling)
+        height, width = display_frame.shape[:2]
+        label_width, label_height = self.display_size
+        scale = min(label_width / width, label_height / height)
+        target_size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        if target_size != (width, height):
+            if self.use_ocl:
+                display_frame = cv2.resize(cv2.UMat(display_frame), target_size,
+                                           interpolation=cv2.INTER_LINEAR).get()
+            else:
+                display_frame = cv2.resize(display_frame, target_size, interpolation=cv2.INTER_LINEAR)
+        
+        # Convert the scaled BGR frame to RGB for Qt (only the display copy is converted)
+        if self._rgb_buf is None or self._rgb_buf.shape != display_frame.shape:
+            self._rgb_buf = np.empty(display_frame.shape, dtype=np.uint8)
+        rgb_frame = cv2.cvtColor(display_frame, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
         
-    def draw_overlays(self, frame, track_data, keypoints_list, scores_list):
-        """Draw overlays on frame based on display configuration"""
-        # Convert BGR to RGB for display
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        # Convert frame to QPixmap and display
+        # (QImage only wraps _rgb_buf; QPixmap.fromImage deep-copies the pixels,
+        # so the buffer is free to be overwritten by the next frame)
+        height, width, channel = rgb_frame.shape
+        bytes_per_line = 3 * width
+        q_image = QImage(rgb_frame.data, width, height, bytes_per_line, QImage.Format_RGB888)
+        self.video_label.setPixmap(QPixmap.fromImage(q_image))
+        
+    def draw_overlays(self, frame, track_data, keypoints_array, scores_array):
+        """Draw overlays in place on the BGR frame based on display configuration"""
+        # The frame is a fresh buffer per emitted frame (not reused by the video
+        # thread), so it is drawn on directly and stays BGR for the video writer
+
+        # Active skeleton connections grouped by (color, thickness), cached in the
+        # config, so each group is drawn with a single cv2.polylines call per person
+        conn_groups = self.config.connection_groups
         
         for i, track in enumerate(track_data):
             track_id = track['id']
@@ -173,7 +277,7 @@ class TreadmillMainWindow(QMainWindow):
             # Draw bounding box
             if self.config.show_bboxes:
                 x1, y1, x2, y2 = [int(v) for v in bbox]
-                cv2.rectangle(frame, (x1, y1), (x2, y2), (255, 0, 0), 2)
+                cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 0, 255), 2)
             
             # Draw track ID
             if self.config.show_track_ids:
@@ -182,84 +286,133 @@ class TreadmillMainWindow(QMainWindow):
                 if score is not None:
                     label += f" | {score:.2f}"
                 cv2.putText(frame, label, (x1, y1 - 5),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 0, 0), 2)
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
             
             # Draw keypoints and skeleton
-            if i < len(keypoints_list):
-                # Convert lists back to numpy arrays for processing
-                keypoints = np.array(keypoints_list[i])
-                kpt_scores = np.array(scores_list[i])
+            if i < len(keypoints_array):
+                keypoints = keypoints_array[i]
+                kpt_scores = scores_array[i]
+                pts = keypoints.astype(np.int32)
+                visible = kpt_scores > 0.3
                 
-                # Draw skeleton connections
-                if self.config.show_skeleton:
-                    connections = self.config.get_active_connections()
-                    for conn in connections:
-                        idx1, idx2 = conn['indices']
-                        if kpt_scores[idx1] > 0.3 and kpt_scores[idx2] > 0.3:
-                            pt1 = (int(keypoints[idx1][0]), int(keypoints[idx1][1]))
-                            pt2 = (int(keypoints[idx2][0]), int(keypoints[idx2][1]))
-                            # Convert BGR to RGB for display
-                            color = (conn['color'][2], conn['color'][1], conn['color'][0])
-                            cv2.line(frame, pt1, pt2, color, conn['thickness'])
+                # Draw skeleton connections (only segments with both ends visible)
+                for (color, thickness), pairs in conn_groups.items():
+                    segments = pts[pairs[visible[pairs].all(axis=1)]]
+                    if len(segments) > 0:
+                        cv2.polylines(frame, segments, False, color, thickness)
                 
                 # Draw keypoints
                 if self.config.show_keypoints:
-                    for j, (kpt, kpt_score) in enumerate(zip(keypoints, kpt_scores)):
-                        if kpt_score > 0.3:
-                            pt = (int(kpt[0]), int(kpt[1]))
-                            # Use green for left side, orange for right side
-                            color = (0, 255, 0) if j % 2 == 1 else (255, 128, 0)
-                            cv2.circle(frame, pt, self.config.keypoint_size, color, -1)
+                    visible_idx = np.flatnonzero(visible)
+                    for j, pt in zip(visible_idx.tolist(), pts[visible_idx].tolist()):
+                        # Use green for left side, orange for right side
+                        color = (0, 255, 0) if j % 2 == 1 else (0, 128, 255)
+                        cv2.circle(frame, tuple(pt), self.config.keypoint_size, color, -1)
         
         return frame
         
+    def reset_recording_data(self):
+        """Preallocate typed recording buffers (filled by record_value)"""
+        self.recording_data = {
+            'hip_angles': np.empty(MAX_REC_FRAMES, dtype=np.float32),
+            'knee_angles': np.empty(MAX_REC_FRAMES, dtype=np.float32),
+            'ankle_coords': np.empty((MAX_REC_FRAMES, 2), dtype=np.float64)  # Full keypoint precision in the CSV
+        }
+        self.recording_counts = {key: 0 for key in self.recording_data}
+        
+    def record_value(self, key, value):
+        """Append a value to a recording buffer, doubling its capacity if full"""
+        buf = self.recording_data[key]
+        n = self.recording_counts[key]
+        if n == len(buf):
+            buf = np.concatenate([buf, np.empty((max(len(buf), 1), *buf.shape[1:]), dtype=buf.dtype)])
+            self.recording_data[key] = buf
+        buf[n] = value
+        self.recording_counts[key] = n + 1
+        
     def on_recording_started(self, recording_name):
         """Handle recording start"""
         self.is_recording = True
         self.recording_name = recording_name
         self.frame_count = 0
-        self.recording_data = {
-            'hip_angles': [],
-            'knee_angles': [],
-            'ankle_coords': [],
-            'frames': []
-        }
+        self.reset_recording_data()
+        
+        # Start the video writer thread
+        output_dir = os.path.join('output', recording_name)
+        os.makedirs(output_dir, exist_ok=True)
+        self.video_path = os.path.join(output_dir, f'{recording_name}.mp4')
+        self._write_q = queue.Queue(maxsize=64)  # Bounded: blocks the GUI if the encoder falls behind
+        self._writer_thread = Thread(target=self.write_video_frames,
+                                     args=(self._write_q, self.video_path))
+        self._writer_thread.start()
         print(f"Recording started: {recording_name}")
         
+    def write_video_frames(self, write_q, video_path):
+        """Writer thread: encode queued frames until the None sentinel arrives"""
+        video_writer = None
+        while True:
+            frame = write_q.get()
+            if frame is None:
+                break
+            
+            # Create video writer from first frame dimensions
+            if video_writer is None:
+                height, width = frame.shape[:2]
+                video_writer = open_video_writer(video_path, 30, (width, height))
+            
+            # Frames are already BGR
+            video_writer.write(frame)
+        
+        if video_writer is None:
+            print("No frames to save")
+            return
+        video_writer.release()
+        print(f"Video saved: {video_path}")
+        
     def on_recording_stopped(self):
         """Handle recording stop and trigger analysis"""
         self.is_recording = False
+        
+        # Signal the writer thread to finish (joined in the analysis thread)
+        self._write_q.put(None)
         print(f"Recording stopped: {self.recording_name}")
         print(f"Recorded {self.frame_count} frames")
         
+        # Hand this recording's trimmed buffers, name, video and writer to the
+        # analysis thread: a new recording may replace them on self meanwhile
+        recording_data = {key: buf[:self.recording_counts[key]]
+                          for key, buf in self.recording_data.items()}
+        
         # Run analysis in separate thread to avoid blocking GUI
-        analysis_thread = Thread(target=self.analyze_and_save_recording)
+        analysis_thread = Thread(target=self.analyze_and_save_recording,
+                                 args=(recording_data, self.recording_name,
+                                       self.video_path, self._writer_thread))
         analysis_thread.start()
         
-    def analyze_and_save_recording(self):
+    def analyze_and_save_recording(self, recording_data, recording_name, video_path, writer_thread):
         """Analyze recording and save all outputs"""
         try:
             # Create output directory
-            output_dir = os.path.join('output', self.recording_name)
+            output_dir = os.path.join('output', recording_name)
             os.makedirs(output_dir, exist_ok=True)
             
             # Save CSV file
-            self.save_csv(output_dir)
+            self.save_csv(output_dir, recording_name, recording_data)
             
-            # Save video
-            self.save_video(output_dir)
+            # Wait for the video writer to flush remaining frames
+            writer_thread.join()
             
             # Perform gait analysis if we have enough data
-            if len(self.recording_data['hip_angles']) > 30:  # At least 1 second of data
+            if len(recording_data['hip_angles']) > 30:  # At least 1 second of data
                 print("Performing gait analysis...")
                 results = analyze_recording(
-                    self.recording_data['hip_angles'],
-                    self.recording_data['knee_angles'],
-                    self.recording_data['ankle_coords'],
+                    recording_data['hip_angles'],
+                    recording_data['knee_angles'],
+                    recording_data['ankle_coords'],
                     output_dir,
-                    self.recording_name,
+                    recording_name,
                     fps=30,
-                    frames=self.recording_data['frames']
+                    frames=RecordedVideoFrames(video_path)
                 )
                 print(f"Analysis complete: {results['num_strides']} strides detected")
             else:
@@ -271,52 +424,32 @@ class TreadmillMainWindow(QMainWindow):
             print(f"Error during analysis: {str(e)}")
             self.show_error(f"Error during analysis: {str(e)}")
             
-    def save_csv(self, output_dir):
+    def save_csv(self, output_dir, recording_name, recording_data):
         """Save recording data to CSV file"""
-        csv_path = os.path.join(output_dir, f'{self.recording_name}.csv')
-        
+        csv_path = os.path.join(output_dir, f'{recording_name}.csv')
+        
+        # Same cells as a csv.writer row loop (angles as ints, ankle at full
+        # precision, missing values empty), formatted per column and written in one call
+        hip_angles = recording_data['hip_angles']
+        num_frames = len(hip_angles)
+        knee_angles = recording_data['knee_angles'][:num_frames]
+        ankle_coords = recording_data['ankle_coords'][:num_frames]
+        
+        columns = [
+            [str(i) for i in range(num_frames)],
+            [f'{i / 30.0:.3f}' for i in range(num_frames)],  # 30 fps
+            csv_column(hip_angles, lambda v: str(int(v)), num_frames),
+            csv_column(knee_angles, lambda v: str(int(v)), num_frames),
+            csv_column(ankle_coords[:, 0], repr, num_frames),
+            csv_column(ankle_coords[:, 1], repr, num_frames),
+        ]
+        lines = ['frame,time_s,hip_angle,knee_angle,ankle_x,ankle_y']
+        lines.extend(','.join(row) for row in zip(*columns))
         with open(csv_path, 'w', newline='') as csvfile:
-            writer = csv.writer(csvfile)
-            
-            # Write header
-            writer.writerow(['frame', 'time_s', 'hip_angle', 'knee_angle', 'ankle_x', 'ankle_y'])
-            
-            # Write data
-            num_frames = len(self.recording_data['hip_angles'])
-            for i in range(num_frames):
-                frame_num = i
-                time_s = i / 30.0  # 30 fps
-                hip_angle = self.recording_data['hip_angles'][i] if i < len(self.recording_data['hip_angles']) else ''
-                knee_angle = self.recording_data['knee_angles'][i] if i < len(self.recording_data['knee_angles']) else ''
-                ankle_x, ankle_y = self.recording_data['ankle_coords'][i] if i < len(self.recording_data['ankle_coords']) else ('', '')
-                
-                writer.writerow([frame_num, f'{time_s:.3f}', hip_angle, knee_angle, ankle_x, ankle_y])
+            csvfile.write('\r\n'.join(lines) + '\r\n')
         
         print(f"CSV saved: {csv_path}")
         
-    def save_video(self, output_dir):
-        """Save recorded video frames"""
-        video_path = os.path.join(output_dir, f'{self.recording_name}.mp4')
-        
-        if len(self.recording_data['frames']) == 0:
-            print("No frames to save")
-            return
-        
-        # Get frame dimensions
-        height, width = self.recording_data['frames'][0].shape[:2]
-        
-        # Create video writer
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        video_writer = cv2.VideoWriter(video_path, fourcc, 30, (width, height))
-        
-        # Write frames (convert RGB back to BGR for video)
-        for frame in self.recording_data['frames']:
-            bgr_frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-            video_writer.write(bgr_frame)
-        
-        video_writer.release()
-        print(f"Video saved: {video_path}")
-        
     def show_error(self, error_message):
         """Show error message dialog"""
         QMessageBox.critical(self, "Error", error_message)
@@ -326,4 +459,10 @@ class TreadmillMainWindow(QMainWindow):
         if self.video_thread is not None:
             self.video_thread.stop()
             self.video_thread.wait()
+        
+        # Finish any in-progress video so the writer thread can exit
+        if self.is_recording:
+            self.is_recording = False
+            self._write_q.put(None)
+            self._writer_thread.join()
         event.accept()
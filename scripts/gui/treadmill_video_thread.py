@@ -6,18 +6,24 @@ from PyQt5.QtCore import QThread, pyqtSignal
 import cv2
 import numpy as np
 import os
+import queue
+import time
+from threading import Thread
 from argparse import Namespace
 from rtmlib import RTMDet, RTMPose
 from yolox.tracker.byte_tracker import BYTETracker
 from paths import MODEL_DIR
 from .test_gopro_stream import GoProCam
 
+# Pause before retrying a failed GoPro read (seconds)
+READ_RETRY_DELAY = 0.01
+
 
 class TreadmillVideoThread(QThread):
     """Thread for processing video frames with pose estimation"""
     
     # Signals
-    frame_ready = pyqtSignal(object, list, list, list)  # frame, track_data, keypoints, scores
+    frame_ready = pyqtSignal(object, list, object, object, int)  # frame, track_data, keypoints (N,17,2), scores (N,17), frame_id
     error_occurred = pyqtSignal(str)
     
     def __init__(self, config):
@@ -26,6 +32,16 @@ class TreadmillVideoThread(QThread):
         self.running = False
         self.gopro_cam = None
         
+        # Camera reader (frames are grabbed while the previous one is being processed)
+        self._frame_q = None
+        self._reader_thread = None
+        
+        # Reused ByteTrack input buffer (x1, y1, x2, y2, score, class), grown on demand
+        self._det_buf = np.zeros((16, 6))
+        
+        # Id of the most recently emitted frame (lets the GUI skip stale frames)
+        self.latest_frame_id = 0
+        
         # Models
         self.detector = None
         self.tracker = None
@@ -53,7 +69,7 @@ class TreadmillVideoThread(QThread):
                 onnx_model=self.rtmdet_model,
                 model_input_size=(640, 640),
                 backend='onnxruntime',
-                device='cuda'
+                device='tensorrt'
             )
             
             # Initialize tracker
@@ -72,7 +88,7 @@ class TreadmillVideoThread(QThread):
                 onnx_model=self.rtmpose_model,
                 model_input_size=(192, 256),
                 backend='onnxruntime',
-                device='cuda'
+                device='tensorrt'
             )
             
             return True
@@ -101,6 +117,23 @@ class TreadmillVideoThread(QThread):
             self.error_occurred.emit(f"Failed to initialize GoPro camera: {str(e)}")
             return False
             
+    def read_frames(self, frame_q):
+        """Reader loop: grab GoPro frames and hand them to the processing loop"""
+        while self.running:
+            ret, frame = self.gopro_cam.read()
+            if not ret:
+                # Stalled or ended source: wait briefly instead of spinning next to detection/pose
+                time.sleep(READ_RETRY_DELAY)
+                continue
+            
+            # Drop the oldest frame if processing is behind, to stay realtime
+            if frame_q.full():
+                try:
+                    frame_q.get_nowait()
+                except queue.Empty:
+                    pass
+            frame_q.put(frame)
+            
     def release_camera(self):
         """Release camera resources"""
         if self.gopro_cam is not None:
@@ -156,11 +189,17 @@ class TreadmillVideoThread(QThread):
             
         self.running = True
         
+        # Start camera reader so capture overlaps with detection/pose
+        self._frame_q = queue.Queue(maxsize=2)
+        self._reader_thread = Thread(target=self.read_frames, args=(self._frame_q,), daemon=True)
+        self._reader_thread.start()
+        
         try:
             while self.running:
-                # Capture frame from GoPro
-                ret, frame = self.gopro_cam.read()
-                if not ret:
+                # Get latest captured frame from the reader
+                try:
+                    frame = self._frame_q.get(timeout=0.1)
+                except queue.Empty:
                     continue
                 
                 height, width = frame.shape[:2]
@@ -169,12 +208,15 @@ class TreadmillVideoThread(QThread):
                 det_bboxes_scores, _ = self.detector(frame)
                 det_bboxes, det_scores = det_bboxes_scores
                 
-                # Step 2: Format for ByteTrack
-                if len(det_bboxes) > 0:
-                    dets_for_tracker = np.array([[*box, score, 0] 
-                                                for box, score in zip(det_bboxes, det_scores)])
-                else:
-                    dets_for_tracker = np.empty((0, 6))
+                # Step 2: Format for ByteTrack (filled into the reused buffer;
+                # class column stays 0)
+                num_dets = len(det_bboxes)
+                if num_dets > len(self._det_buf):
+                    self._det_buf = np.zeros((2 * num_dets, 6))
+                dets_for_tracker = self._det_buf[:num_dets]
+                if num_dets > 0:
+                    dets_for_tracker[:, :4] = det_bboxes
+                    dets_for_tracker[:, 4] = det_scores
                 
                 # Step 3: Tracking
                 tracks = self.tracker.update(dets_for_tracker, [height, width], (height, width))
@@ -200,21 +242,23 @@ class TreadmillVideoThread(QThread):
                     tracked_bboxes.append([x1, y1, x2, y2])
                 
                 # Step 5: Pose estimation
-                keypoints_list = []
-                scores_list = []
+                # Arrays are emitted as-is (object signal args), no list round-trip
+                keypoints_array = np.empty((0, 17, 2), dtype=np.float32)
+                scores_array = np.empty((0, 17), dtype=np.float32)
                 
                 if len(tracked_bboxes) > 0:
                     keypoints_array, scores_array, _ = self.pose_estimator(frame, tracked_bboxes)
-                    # Convert numpy arrays to lists for PyQt5 signal
-                    keypoints_list = [kp.tolist() if isinstance(kp, np.ndarray) else kp for kp in keypoints_array]
-                    scores_list = [sc.tolist() if isinstance(sc, np.ndarray) else sc for sc in scores_array]
                 
                 # Emit processed frame data
-                self.frame_ready.emit(frame, track_data, keypoints_list, scores_list)
+                self.latest_frame_id += 1
+                self.frame_ready.emit(frame, track_data, keypoints_array, scores_array, self.latest_frame_id)
                 
         except Exception as e:
             self.error_occurred.emit(f"Error in processing loop: {str(e)}")
         finally:
+            self.running = False
+            self._reader_thread.join()
+            self._reader_thread = None
             self.release_camera()
             
     def stop(self):
@@ -5,18 +5,73 @@ from PyQt5.QtCore import QThread, pyqtSignal
 import cv2
 import numpy as np
 import os
+import queue
+import threading
+import time
 from argparse import Namespace
 from rtmlib import RTMDet, RTMPose
 from yolox.tracker.byte_tracker import BYTETracker
 from paths import MODEL_DIR
+from track_utils import tracks_to_array
+from stitching import stitch_frames
 from .test_gopro_stream import GoProCam
 
 
+# Quadrant (x, y) offsets of each camera in the 2x2 "all_ip" grid
+TILE_SIZE = (960, 540)
+TILE_OFFSETS = {1: (0, 0), 2: (960, 0), 3: (0, 540), 4: (960, 540)}
+
+# ByteTrack input for frames without detections, shared instead of reallocated.
+# Left writable: BYTETracker.update scales its box columns in place (a no-op
+# on zero rows), which would raise on a read-only array.
+_EMPTY_DETS = np.empty((0, 6), dtype=np.float32)
+
+# Pause before retrying a failed camera grab/retrieve (seconds)
+READ_RETRY_DELAY = 0.01
+
+
+# Detector and pose models shared across thread restarts (session creation and
+# TensorRT engine loading take seconds); only the trackers are rebuilt per run
+_shared_models = {}
+
+
+def prefer_int8(model_path):
+    """Return the INT8-quantized version of a model if it exists"""
+    int8_path = model_path.replace('.onnx', '.int8.onnx')
+    return int8_path if os.path.exists(int8_path) else model_path
+
+
+def load_shared_models(rtmdet_model, rtmpose_model):
+    """Create (once) and return the shared RTMDet and RTMPose models"""
+    if not _shared_models:
+        detector = RTMDet(
+            onnx_model=rtmdet_model,
+            model_input_size=(640, 640),
+            backend='onnxruntime',
+            device='tensorrt'
+        )
+        pose_estimator = RTMPose(
+            onnx_model=rtmpose_model,
+            model_input_size=(192, 256),
+            backend='onnxruntime',
+            device='tensorrt'
+        )
+        
+        # Warm-up run so kernels/engines are materialized before the first real frame
+        dummy = np.zeros((640, 640, 3), dtype=np.uint8)
+        detector(dummy)
+        pose_estimator(dummy, [[0, 0, 192, 256]])
+        
+        _shared_models['detector'] = detector
+        _shared_models['pose_estimator'] = pose_estimator
+    return _shared_models['detector'], _shared_models['pose_estimator']
+
+
 class VideoProcessingThread(QThread):
     """Thread for processing video frames with pose estimation"""
     
     # Signals
-    frame_ready = pyqtSignal(object, list, list, list, dict)  # frame, track_data, keypoints, scores, angles
+    frame_ready = pyqtSignal(object, object, object, object, dict)  # frame, tracks (N,6), keypoints (N,17,2), scores (N,17), angles
     error_occurred = pyqtSignal(str)
     
     def __init__(self, config):
@@ -26,25 +81,37 @@ class VideoProcessingThread(QThread):
         self.cameras = {}
         self.gopro_cam = None
         
+        # IP camera reader threads, each keeping only its latest frame. Frames are
+        # decoded into a 3-slot buffer ring per camera: the reader always has a
+        # slot that is neither the latest frame nor the one being consumed.
+        self._reader_threads = []
+        self._readers_running = False
+        self._cam_bufs = {}
+        self._latest_slot = {}
+        self._reading_slot = {}
+        self._frame_lock = threading.Lock()
+        self._new_frame = threading.Event()
+        
+        # OpenCL stitching (set in initialize_cameras)
+        self.use_ocl = False
+        self._stitch_umat = None
+        
         # Models
         self.detector = None
         self.tracker = None
+        self.tile_trackers = {}  # One tracker per camera in "all_ip" mode
         self.pose_estimator = None
         
-        # Model paths
-        self.rtmdet_model = os.path.join(MODEL_DIR, 'rtmdet-m-640.onnx')
-        self.rtmpose_model = os.path.join(MODEL_DIR, 'rtmpose-m-256-192.onnx')
+        # Model paths (INT8 models from quantize_models.py are used when present)
+        self.rtmdet_model = prefer_int8(os.path.join(MODEL_DIR, 'rtmdet-m-640.onnx'))
+        self.rtmpose_model = prefer_int8(os.path.join(MODEL_DIR, 'rtmpose-m-256-192.onnx'))
         
     def initialize_models(self):
         """Initialize detection, tracking, and pose estimation models"""
         try:
-            # Initialize detector
-            self.detector = RTMDet(
-                onnx_model=self.rtmdet_model,
-                model_input_size=(640, 640),
-                backend='onnxruntime',
-                device='cuda'
-            )
+            # Get detector and pose estimator (loaded once, reused across restarts)
+            self.detector, self.pose_estimator = load_shared_models(self.rtmdet_model,
+                                                                    self.rtmpose_model)
             
             # Initialize tracker
             args = Namespace(
@@ -56,14 +123,7 @@ class VideoProcessingThread(QThread):
                 min_hits=3
             )
             self.tracker = BYTETracker(args)
-            
-            # Initialize pose estimator
-            self.pose_estimator = RTMPose(
-                onnx_model=self.rtmpose_model,
-                model_input_size=(192, 256),
-                backend='onnxruntime',
-                device='cuda'
-            )
+            self.tile_trackers = {cam_id: BYTETracker(args) for cam_id in TILE_OFFSETS}
             
             return True
         except Exception as e:
@@ -82,11 +142,11 @@ class VideoProcessingThread(QThread):
                 cam_id = self.config.selected_camera
                 if cam_id not in self.config.camera_urls:
                     raise ValueError(f"Invalid camera selection: {cam_id}")
-                self.cameras[cam_id] = cv2.VideoCapture(self.config.camera_urls[cam_id])
+                self.cameras[cam_id] = self.open_ip_camera(self.config.camera_urls[cam_id])
                 
             elif self.config.camera_mode == "all_ip":
                 for cam_id, url in self.config.camera_urls.items():
-                    self.cameras[cam_id] = cv2.VideoCapture(url)
+                    self.cameras[cam_id] = self.open_ip_camera(url)
                     
             elif self.config.camera_mode == "single_gopro":
                 # Initialize GoPro camera
@@ -99,16 +159,77 @@ class VideoProcessingThread(QThread):
                 )
                 self.gopro_cam.open()
             
+            # Read IP cameras on their own threads so reads overlap each other
+            # and processing (capture only snapshots the latest frames)
+            if self.cameras:
+                self._cam_bufs = {cam_id: [None, None, None] for cam_id in self.cameras}
+                self._latest_slot = {cam_id: -1 for cam_id in self.cameras}
+                self._reading_slot = {cam_id: -1 for cam_id in self.cameras}
+                self._new_frame.clear()
+                self._readers_running = True
+                # Stitched frames are copies, so "all_ip" readers can decode in place;
+                # a single camera's frame is emitted to the GUI and must stay fresh
+                reuse_buffers = self.config.camera_mode == "all_ip"
+                self._reader_threads = [
+                    threading.Thread(target=self.read_camera, args=(cam_id, cap, reuse_buffers),
+                                     daemon=True)
+                    for cam_id, cap in self.cameras.items()
+                ]
+                for reader in self._reader_threads:
+                    reader.start()
+            
             # Enable OpenCV optimizations
             cv2.setUseOptimized(True)
             
+            # Resize camera frames with OpenCL when a device is available
+            self.use_ocl = cv2.ocl.haveOpenCL()
+            cv2.ocl.setUseOpenCL(self.use_ocl)
+            
             return True
         except Exception as e:
             self.error_occurred.emit(f"Failed to initialize cameras: {str(e)}")
             return False
             
+    def open_ip_camera(self, url):
+        """Open an RTSP camera with minimal internal buffering"""
+        cap = cv2.VideoCapture(url)
+        # Keep at most one decoded frame queued inside the capture (not honored by
+        # every backend; the reader thread draining the stream covers the rest)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        return cap
+        
+    def read_camera(self, cam_id, cap, reuse_buffers):
+        """Reader loop: keep only the most recent frame of one IP camera
+        
+        With reuse_buffers, frames are decoded straight into the camera's ring
+        slots (retrieve into a preallocated array) instead of a new array.
+        """
+        bufs = self._cam_bufs[cam_id]
+        while self._readers_running:
+            # A dropped stream fails every call at once: wait briefly instead of spinning
+            if not cap.grab():
+                time.sleep(READ_RETRY_DELAY)
+                continue
+            with self._frame_lock:
+                slot = next(i for i in range(3)
+                            if i != self._latest_slot[cam_id] and i != self._reading_slot[cam_id])
+            ret, frame = cap.retrieve(bufs[slot] if reuse_buffers else None)
+            if not ret:
+                time.sleep(READ_RETRY_DELAY)
+                continue
+            bufs[slot] = frame
+            with self._frame_lock:
+                self._latest_slot[cam_id] = slot
+            self._new_frame.set()
+            
     def release_cameras(self):
         """Release all camera resources"""
+        # Stop reader threads before releasing their captures
+        self._readers_running = False
+        for reader in self._reader_threads:
+            reader.join()
+        self._reader_threads = []
+        
         for cap in self.cameras.values():
             if cap is not None:
                 cap.release()
@@ -119,46 +240,136 @@ class VideoProcessingThread(QThread):
             self.gopro_cam.close()
             self.gopro_cam = None
         
-    def capture_frame(self):
-        """Capture frame(s) based on camera configuration"""
-        if self.config.camera_mode == "single_gopro":
-            # Capture from GoPro
-            ret, frame = self.gopro_cam.read()
-            if not ret:
-                return None, None
-            return frame, None  # No angle camera for single GoPro
+    def latest_ip_frames(self):
+        """Wait for a new IP camera frame, then snapshot the latest frame of each camera"""
+        if not self._new_frame.wait(timeout=0.1):
+            return None
+        self._new_frame.clear()
         
-        # Handle IP cameras
-        frames = {}
+        with self._frame_lock:
+            if any(slot < 0 for slot in self._latest_slot.values()):
+                return None
+            # Hold the latest slots until the next capture so readers skip them
+            self._reading_slot.update(self._latest_slot)
+        return {cam_id: self._cam_bufs[cam_id][slot]
+                for cam_id, slot in self._reading_slot.items()}
         
-        for cam_id, cap in self.cameras.items():
-            ret, frame = cap.read()
-            if not ret:
-                return None, None
-            frames[cam_id] = frame
+    # Capture methods, one per camera mode (selected once in detect_frames)
+    def _capture_single_gopro(self):
+        ret, frame = self.gopro_cam.read()
+        if not ret:
+            return None, None
+        return frame, None  # No angle camera for single GoPro
+        
+    def _capture_single_ip(self):
+        frames = self.latest_ip_frames()
+        if frames is None:
+            return None, None
+        return frames[self.config.selected_camera], self.config.selected_camera
+        
+    def _capture_all_ip(self):
+        frames = self.latest_ip_frames()
+        if frames is None:
+            return None, None
+        # Stitch frames into 2x2 grid
+        stitched = self.stitch_frames(frames[1], frames[2], frames[3], frames[4])
+        return stitched, self.config.angle_computation_camera
         
-        if self.config.camera_mode == "single_ip":
-            return frames[self.config.selected_camera], self.config.selected_camera
-        elif self.config.camera_mode == "all_ip":
-            # Stitch frames into 2x2 grid
-            stitched = self.stitch_frames(frames[1], frames[2], frames[3], frames[4])
-            return stitched, self.config.angle_computation_camera
-            
     def stitch_frames(self, frame_1, frame_2, frame_3, frame_4):
         """Stitch 4 camera frames into a 2x2 grid"""
-        size = (960, 540)
-        f1 = cv2.resize(frame_1, size)
-        f2 = cv2.resize(frame_2, size)
-        f3 = cv2.resize(frame_3, size)
-        f4 = cv2.resize(frame_4, size)
+        # The canvas is emitted to the GUI thread, so a new one is used per frame;
+        # with OpenCL, tiles are resized into a persistent device canvas instead
+        if self.use_ocl and self._stitch_umat is None:
+            tile_w, tile_h = TILE_SIZE
+            self._stitch_umat = cv2.UMat(2 * tile_h, 2 * tile_w, cv2.CV_8UC3)
+        # INTER_AREA: box filter, sharper and cheaper for integer downscales
+        return stitch_frames((frame_1, frame_2, frame_3, frame_4), TILE_SIZE,
+                             ocl_canvas=self._stitch_umat if self.use_ocl else None,
+                             interpolation=cv2.INTER_AREA)
+        
+    def format_detections(self, det_bboxes, det_scores):
+        """Assemble the (N, 6) ByteTrack input [x1, y1, x2, y2, score, class] with numpy"""
+        num_dets = len(det_bboxes)
+        if num_dets == 0:
+            return _EMPTY_DETS
+        dets_for_tracker = np.empty((num_dets, 6), dtype=np.float32)
+        dets_for_tracker[:, :4] = det_bboxes
+        dets_for_tracker[:, 4] = det_scores
+        dets_for_tracker[:, 5] = 0
+        return dets_for_tracker
+        
+    def detect(self, frame):
+        """Run detection on a frame, returning one (bboxes, scores) pair per camera
+        
+        In "all_ip" mode the 4 camera tiles are detected in one batched call.
+        """
+        if self.config.camera_mode == "all_ip":
+            tile_w, tile_h = TILE_SIZE
+            tiles = [frame[y:y + tile_h, x:x + tile_w] for x, y in TILE_OFFSETS.values()]
+            detections, _ = self.detector.detect_batch(tiles)
+            return detections
+        
+        det_bboxes_scores, _ = self.detector(frame)
+        return [det_bboxes_scores]
+        
+    def track(self, frame, detections):
+        """Track detections, one ByteTrack per camera in "all_ip" mode
+        
+        Returns an (N, 6) array [x1, y1, x2, y2, id, score]. Boxes are in frame
+        coordinates (stitched-frame coordinates in "all_ip" mode) so pose
+        estimation and drawing work on the whole frame.
+        """
+        if self.config.camera_mode != "all_ip":
+            height, width = frame.shape[:2]
+            det_bboxes, det_scores = detections[0]
+            dets_for_tracker = self.format_detections(det_bboxes, det_scores)
+            tracks = self.tracker.update(dets_for_tracker, [height, width], (height, width))
+            return tracks_to_array(tracks)
         
-        top = np.hstack((f1, f2))
-        bottom = np.hstack((f3, f4))
-        combined = np.vstack((top, bottom))
-        return combined
+        tile_w, tile_h = TILE_SIZE
+        cam_tracks = []
+        for (cam_id, offset), (det_bboxes, det_scores) in zip(TILE_OFFSETS.items(), detections):
+            # Format for ByteTrack
+            dets_for_tracker = self.format_detections(det_bboxes, det_scores)
+            
+            # Tracking (track IDs are globally unique across ByteTrack instances)
+            tracks = self.tile_trackers[cam_id].update(dets_for_tracker, [tile_h, tile_w], (tile_h, tile_w))
+            cam_tracks.append(tracks_to_array(tracks, offset))
+        
+        return np.concatenate(cam_tracks)
+        
+    def detect_frames(self, detected):
+        """Stage 1: capture and detect, handing results to the pose stage
+        
+        The queue holds one frame; if the pose stage is behind, the stale
+        result is replaced so detection of frame N+1 overlaps pose of frame N.
+        """
+        try:
+            capture = {
+                'single_ip': self._capture_single_ip,
+                'all_ip': self._capture_all_ip,
+                'single_gopro': self._capture_single_gopro,
+            }[self.config.camera_mode]
+            
+            while self.running:
+                # Frames stay BGR from capture through detect/pose (no cvtColor here)
+                frame, angle_camera = capture()
+                if frame is None:
+                    continue
+                
+                detections = self.detect(frame)
+                
+                try:
+                    detected.get_nowait()
+                except queue.Empty:
+                    pass
+                detected.put((frame, detections))
+        except Exception as e:
+            self.error_occurred.emit(f"Error in detection loop: {str(e)}")
+            self.running = False
         
     def run(self):
-        """Main processing loop"""
+        """Main processing loop (stage 2: track, pose and emit)"""
         # Initialize models
         if not self.initialize_models():
             return
@@ -169,71 +380,43 @@ class VideoProcessingThread(QThread):
             
         self.running = True
         
+        detected = queue.Queue(maxsize=1)
+        detect_thread = threading.Thread(target=self.detect_frames, args=(detected,), daemon=True)
+        detect_thread.start()
+        
         try:
             while self.running:
-                # Capture frame
-                frame, angle_camera = self.capture_frame()
-                if frame is None:
+                try:
+                    frame, detections = detected.get(timeout=0.1)
+                except queue.Empty:
                     continue
                 
-                height, width = frame.shape[:2]
-                
-                # Step 1: Detection
-                det_bboxes_scores, _ = self.detector(frame)
-                det_bboxes, det_scores = det_bboxes_scores
-                
-                # Step 2: Format for ByteTrack
-                if len(det_bboxes) > 0:
-                    dets_for_tracker = np.array([[*box, score, 0] 
-                                                for box, score in zip(det_bboxes, det_scores)])
-                else:
-                    dets_for_tracker = np.empty((0, 6))
-                
-                # Step 3: Tracking
-                tracks = self.tracker.update(dets_for_tracker, [height, width], (height, width))
-                
-                # Step 4: Prepare data for pose estimation
-                track_data = []
-                tracked_bboxes = []
-                
-                for track in tracks:
-                    if not track.is_activated:
-                        continue
-                    
-                    x1, y1, w, h = track.tlwh
-                    x2, y2 = x1 + w, y1 + h
-                    track_id = int(track.track_id)
-                    score = track.score if hasattr(track, "score") else 0.0
-                    
-                    track_data.append({
-                        'id': track_id,
-                        'bbox': [x1, y1, x2, y2],
-                        'score': score
-                    })
-                    tracked_bboxes.append([x1, y1, x2, y2])
+                # Tracking and pose inputs
+                tracks = self.track(frame, detections)
+                tracked_bboxes = tracks[:, :4]
                 
-                # Step 5: Pose estimation
-                keypoints_list = []
-                scores_list = []
+                # Pose estimation
+                # Arrays are emitted as-is (object signal args), no list round-trip
+                keypoints_array = np.empty((0, 17, 2), dtype=np.float32)
+                scores_array = np.empty((0, 17), dtype=np.float32)
                 
                 if len(tracked_bboxes) > 0:
                     keypoints_array, scores_array, _ = self.pose_estimator(frame, tracked_bboxes)
-                    # Convert numpy arrays to lists for PyQt5 signal
-                    keypoints_list = [kp.tolist() if isinstance(kp, np.ndarray) else kp for kp in keypoints_array]
-                    scores_list = [sc.tolist() if isinstance(sc, np.ndarray) else sc for sc in scores_array]
                 
-                # Step 6: Calculate angles for tracked person
+                # Calculate angles for tracked person
                 # In "all" mode, we need to get keypoints from the specific camera
                 # For now, we'll use the keypoints from the stitched frame
                 # (This is a simplification - in production you'd extract from specific camera)
                 angles = {}
                 
                 # Emit processed frame data
-                self.frame_ready.emit(frame, track_data, keypoints_list, scores_list, angles)
+                self.frame_ready.emit(frame, tracks, keypoints_array, scores_array, angles)
                 
         except Exception as e:
             self.error_occurred.emit(f"Error in processing loop: {str(e)}")
         finally:
+            self.running = False
+            detect_thread.join()
             self.release_cameras()
             
     def stop(self):
@@ -0,0 +1,43 @@
+"""
+HDF5 results layout shared by lab_mocap_2Dsquat.py and stream_recorder.py
+"""
+
+# HDF5 fields: one row per tracked person, appended across all frames
+H5_FIELDS = {
+    'track_ids': ((), 'i4'),
+    'bboxes': ((4,), 'f4'),
+    'bbox_scores': ((), 'f4'),
+    'keypoints': ((17, 2), 'f4'),
+    'keypoint_scores': ((17,), 'f4'),
+}
+
+# Multi-camera recordings also store the camera number (1-4) of each row
+H5_CAMERA_FIELDS = {**H5_FIELDS, 'camera_ids': ((), 'i4')}
+
+def create_h5_datasets(h5file, fields=H5_FIELDS):
+    """
+    Create one resizable, chunked (LZF) dataset per field plus a frame index.
+
+    Args:
+        h5file: Open h5py.File
+        fields: Dict of {name: (row shape, dtype)}
+
+    Returns:
+        datasets: Dict of {name: h5py.Dataset}. 'frame_index' rows are
+            (frame_id, first row, row count) into the per-person datasets.
+    """
+    datasets = {}
+    for name, (shape, dtype) in fields.items():
+        datasets[name] = h5file.create_dataset(
+            name, shape=(0, *shape), maxshape=(None, *shape), chunks=(64, *shape),
+            compression='lzf', dtype=dtype)
+    datasets['frame_index'] = h5file.create_dataset(
+        'frame_index', shape=(0, 3), maxshape=(None, 3), chunks=(256, 3), dtype='i8')
+    return datasets
+
+def append_rows(dataset, rows):
+    """Append rows along axis 0 of a resizable dataset, returning the first new row index"""
+    old_len = dataset.shape[0]
+    dataset.resize(old_len + len(rows), axis=0)
+    dataset[old_len:] = rows
+    return old_len
@@ -0,0 +1,10 @@
+"""
+Optional numba: njit compiles when numba is installed, otherwise kernels run as plain Python
+"""
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
@@ -0,0 +1,95 @@
+import os
+import cv2
+from onnxruntime.quantization import (CalibrationDataReader, QuantFormat,
+                                      QuantType, quantize_static)
+from onnxruntime.quantization.shape_inference import quant_pre_process
+from rtmlib import RTMDet, RTMPose
+from paths import MODEL_DIR, DATA_DIR
+
+#---------- CONFIGURATION ------------------
+# Calibration video, ideally recorded from the lab cameras
+CALIBRATION_VIDEO = "calibration.mp4"
+NUM_CALIBRATION_FRAMES = 200
+
+# FP32 models to quantize; outputs are written next to them as *.int8.onnx,
+# which the GUI loads in place of the FP32 models when present
+RTMDET_MODEL = 'rtmdet-m-640.onnx'
+RTMPOSE_MODEL = 'rtmpose-m-256-192.onnx'
+
+# Ops left in FP32 (e.g. detector head) if INT8 accuracy drops
+NODES_TO_EXCLUDE = []
+#-------------------------------------------
+
+
+class BlobReader(CalibrationDataReader):
+    """Feeds preprocessed calibration blobs to quantize_static"""
+    def __init__(self, input_name, blobs):
+        self.input_name = input_name
+        self.blobs = iter(blobs)
+
+    def get_next(self):
+        blob = next(self.blobs, None)
+        return None if blob is None else {self.input_name: blob}
+
+
+def int8_path(model_path):
+    return model_path.replace('.onnx', '.int8.onnx')
+
+
+def quantize(model_path, input_name, blobs):
+    """Static INT8 quantization (QDQ, per-channel weights) of one model"""
+    prep_path = model_path.replace('.onnx', '.prep.onnx')
+    quant_pre_process(model_path, prep_path)
+    quantize_static(
+        prep_path,
+        int8_path(model_path),
+        BlobReader(input_name, blobs),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True,
+        nodes_to_exclude=NODES_TO_EXCLUDE,
+    )
+    os.remove(prep_path)
+    print(f"Saved {int8_path(model_path)}")
+
+
+rtmdet_path = os.path.join(MODEL_DIR, RTMDET_MODEL)
+rtmpose_path = os.path.join(MODEL_DIR, RTMPOSE_MODEL)
+
+# FP32 models provide preprocessing and the person boxes for pose calibration
+detector = RTMDet(onnx_model=rtmdet_path, model_input_size=(640, 640),
+                  backend='onnxruntime', device='cpu')
+pose_estimator = RTMPose(onnx_model=rtmpose_path, model_input_size=(192, 256),
+                         backend='onnxruntime', device='cpu')
+
+# Collect calibration inputs
+det_blobs = []
+pose_blobs = []
+cap = cv2.VideoCapture(os.path.join(DATA_DIR, CALIBRATION_VIDEO))
+total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+step = max(total // NUM_CALIBRATION_FRAMES, 1)
+
+for frame_idx in range(0, total, step):
+    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+    ret, frame = cap.read()
+    if not ret:
+        break
+
+    blob, _ = detector.preprocess(frame)
+    det_blobs.append(blob.copy())
+
+    (det_bboxes, det_scores), _ = detector(frame)
+    if len(det_bboxes) > 0:
+        batch_input, _, _ = pose_estimator.preprocess(frame, det_bboxes)
+        # One person crop per calibration sample
+        pose_blobs.extend(crop[None].copy() for crop in batch_input)
+
+    if len(det_blobs) >= NUM_CALIBRATION_FRAMES:
+        break
+
+cap.release()
+print(f"Calibration set: {len(det_blobs)} frames, {len(pose_blobs)} person crops")
+
+quantize(rtmdet_path, detector.input_name, det_blobs)
+quantize(rtmpose_path, pose_estimator.input_name, pose_blobs[:NUM_CALIBRATION_FRAMES])
@@ -0,0 +1,42 @@
+"""
+2x2 camera mosaic shared by the GUI video thread and the squat/stream scripts
+"""
+import cv2
+import numpy as np
+
+
+def stitch_frames(frames, tile_size, out=None, ocl_canvas=None, interpolation=cv2.INTER_LINEAR):
+    """
+    Resize 4 camera frames straight into the quadrants of a 2x2 grid
+    (cameras left to right, top to bottom; no hstack/vstack copies).
+
+    Args:
+        frames: 4 BGR frames
+        tile_size: (width, height) of each quadrant
+        out: Host mosaic to fill (e.g. reused by the caller), or None for a new array
+        ocl_canvas: Persistent cv2.UMat mosaic. When given, frames are resized on
+            the OpenCL device and downloaded once (get() returns a new array)
+        interpolation: cv2.resize interpolation flag
+
+    Returns:
+        mosaic: (2 * height, 2 * width, 3) uint8 array
+    """
+    tile_w, tile_h = tile_size
+    offsets = ((0, 0), (tile_w, 0), (0, tile_h), (tile_w, tile_h))
+
+    if ocl_canvas is not None:
+        for (x, y), frame in zip(offsets, frames):
+            quadrant = cv2.UMat(ocl_canvas, (y, y + tile_h), (x, x + tile_w))
+            cv2.resize(cv2.UMat(frame), tile_size, dst=quadrant, interpolation=interpolation)
+        return ocl_canvas.get()
+
+    if out is None:
+        out = np.empty((2 * tile_h, 2 * tile_w, 3), dtype=np.uint8)
+    for (x, y), frame in zip(offsets, frames):
+        quadrant = out[y:y + tile_h, x:x + tile_w]
+        if frame.shape[:2] == (tile_h, tile_w):
+            # Already tile-sized (e.g. a 960x540 substream): plain copy
+            np.copyto(quadrant, frame)
+        else:
+            cv2.resize(frame, tile_size, dst=quadrant, interpolation=interpolation)
+    return out
@@ -0,0 +1,99 @@
+"""
+Recorder process for lab_mocap_stream.py.
+
+Writes the HDF5 results and the CSV timing log in a separate process so that
+compression and file I/O do not compete with capture/inference for the GIL.
+Messages arrive pickled on stdin, in order:
+    ('h5', frame_id, track_ids, camera_ids, bboxes, bbox_scores, keypoints, keypoint_scores)
+    ('csv', row)
+When stdin is closed the track presence index is written and the files are closed.
+
+Usage: python stream_recorder.py <h5 file or ""> <csv file or "">
+"""
+import sys
+import csv
+import pickle
+import signal
+import h5py
+import numpy as np
+from h5_results import H5_CAMERA_FIELDS, create_h5_datasets, append_rows
+
+# Flush the CSV log every N rows so a crash loses at most a few seconds of timings
+CSV_FLUSH_EVERY = 100
+
+def write_h5(h5_datasets, track_id_index, frame_id, track_ids, camera_ids, tracked_bboxes, bbox_scores,
+             keypoints_list, scores_list):
+    """Write one frame's results to the HDF5 file"""
+    # Only convert to the dataset dtypes (no copy if they match)
+    track_ids_array = np.asarray(track_ids, dtype=np.int32)
+    bboxes_array = np.asarray(tracked_bboxes, dtype=np.float32)
+    bbox_scores_array = np.asarray(bbox_scores, dtype=np.float32)
+    keypoints_array = np.asarray(keypoints_list, dtype=np.float32)
+    keypoint_scores_array = np.asarray(scores_list, dtype=np.float32)
+
+    if track_ids_array.size > 0:
+        # Append this frame's rows to the extensible datasets
+        first_row = append_rows(h5_datasets['track_ids'], track_ids_array)
+        # Camera number (1-4) of each track; bboxes/keypoints are in that camera's pixels
+        append_rows(h5_datasets['camera_ids'], np.asarray(camera_ids, dtype=np.int32))
+        append_rows(h5_datasets['bboxes'], bboxes_array)
+        append_rows(h5_datasets['bbox_scores'], bbox_scores_array)
+        append_rows(h5_datasets['keypoints'], keypoints_array)
+        append_rows(h5_datasets['keypoint_scores'], keypoint_scores_array)
+        append_rows(h5_datasets['frame_index'], [(frame_id, first_row, len(track_ids_array))])
+
+        for tid in track_ids_array.tolist():
+            if tid not in track_id_index:
+                track_id_index[tid] = []
+            track_id_index[tid].append(frame_id)
+
+def record(h5_path, csv_path, stream):
+    """
+    Write messages from stream until it is closed.
+
+    Args:
+        h5_path: Output HDF5 file, or empty to ignore 'h5' messages
+        csv_path: Output CSV file, or empty to ignore 'csv' messages
+        stream: Binary file object the messages are unpickled from
+    """
+    h5file = None
+    log_fh = None
+    track_id_index = {}
+    if h5_path:
+        # 64 MB chunk cache keeps the partially filled chunks of every dataset in memory
+        h5file = h5py.File(h5_path, "w", rdcc_nbytes=64 * 1024 * 1024)
+        h5_datasets = create_h5_datasets(h5file, H5_CAMERA_FIELDS)
+    if csv_path:
+        log_fh = open(csv_path, 'w', newline='', buffering=1 << 16)
+        log_writer = csv.writer(log_fh)
+
+    csv_rows = 0
+    try:
+        while True:
+            try:
+                kind, *data = pickle.load(stream)
+            except EOFError:
+                break
+            if kind == 'h5' and h5file is not None:
+                write_h5(h5_datasets, track_id_index, *data)
+            elif kind == 'csv' and log_fh is not None:
+                log_writer.writerow(data[0])
+                csv_rows += 1
+                if csv_rows % CSV_FLUSH_EVERY == 0:
+                    log_fh.flush()
+    finally:
+        if log_fh is not None:
+            log_fh.close()
+
+        # Save track presence info to HDF5
+        if h5file is not None:
+            index_group = h5file.create_group("track_presence")
+            for tid, frames in track_id_index.items():
+                index_group.create_dataset(str(tid), data=np.array(frames, dtype='int32'))
+            h5file.close()
+
+
+if __name__ == '__main__':
+    # Ctrl+C reaches the whole console; the stream script ends recording by closing stdin
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    record(sys.argv[1], sys.argv[2], sys.stdin.buffer)
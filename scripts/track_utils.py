@@ -0,0 +1,18 @@
+"""
+ByteTrack output helpers shared by the GUI video thread and lab_mocap_stream.py
+"""
+import numpy as np
+
+
+def tracks_to_array(tracks, offset=(0, 0)):
+    """Convert activated tracks to an (N, 6) array [x1, y1, x2, y2, id, score] (shifted by offset)"""
+    # Single pass over the track objects; everything after is vectorized
+    tracks = np.array([(*t.tlwh, t.track_id, getattr(t, 'score', 0.0))
+                       for t in tracks if t.is_activated],
+                      dtype=np.float32).reshape(-1, 6)
+
+    # tlwh -> xyxy
+    tracks[:, 0] += offset[0]
+    tracks[:, 1] += offset[1]
+    tracks[:, 2:4] += tracks[:, 0:2]
+    return tracks